@@ -10,13 +10,12 @@ import re
 import doctest
 
 from nose2.events import Plugin
-from pkg_resources import resource_filename
 
 
 DOT = '.'
 FLAGS = doctest.ELLIPSIS | doctest.NORMALIZE_WHITESPACE | doctest.REPORT_NDIFF
-TOPDIR = os.path.abspath(
-    os.path.dirname(resource_filename('dirtbike', '__init__.py')))
+# The dirtbike package directory.
+TOPDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 
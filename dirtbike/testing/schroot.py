@@ -1,6 +1,16 @@
 import os
+import sys
+import shlex
+import subprocess
 
-from dirtbike.testing.helpers import call, output
+from dirtbike.testing.helpers import DEVNULL, call, output
+
+
+class ScriptError(subprocess.CalledProcessError):
+    # unittest only reports a CalledProcessError's exit status, so include
+    # the script's transcript, e.g. a failing dirtbike's traceback.
+    def __str__(self):
+        return '{}\n{}'.format(super().__str__(), self.output)
 
 
 class Session:
@@ -27,6 +37,24 @@ class Session:
         session_cmd.extend(command)
         return output(session_cmd, **kws)
 
+    def call_script(self, commands, **kws):
+        # Run a sequence of commands, given as argument lists, with a single
+        # trip into the schroot, stopping at the first one that fails.  Return
+        # the script's combined stdout and stderr, which is also echoed when
+        # debugging, as call() would have let it through.
+        script = ' && '.join(
+            ' '.join(shlex.quote(arg) for arg in command)
+            for command in commands)
+        try:
+            transcript = self.output(
+                ['sh', '-c', script], stderr=subprocess.STDOUT, **kws)
+        except subprocess.CalledProcessError as error:
+            raise ScriptError(
+                error.returncode, error.cmd, error.output) from None
+        if DEVNULL is None:
+            sys.stderr.write(transcript)
+        return transcript
+
     def start(self):
         assert self.id is None, 'Session already started'
         # The Travis CI tests transgrade from Ubuntu to Debian, so first look
@@ -35,9 +63,10 @@ class Session:
         arch = os.environ.get('CH_ARCH')
         distro = os.environ.get('CH_DISTRO')
         if arch is None:
-            arch = output('dpkg-architecture -q DEB_HOST_ARCH').strip()
+            arch = output(
+                ['dpkg-architecture', '-q', 'DEB_HOST_ARCH']).strip()
         if distro is None:
-            distro = output('lsb_release -cs').strip()
+            distro = output(['lsb_release', '-cs']).strip()
         chroot_name = 'dirtbike-{}-{}'.format(distro, arch)
         self.id = output(
             ['schroot', '-u', 'root', '-c', chroot_name, '--begin-session']
@@ -45,6 +74,5 @@ class Session:
 
     def end(self):
         assert self.id is not None, 'No session'
-        self.call('rm -rf dist')
         call(['schroot', '-u', 'root', '-c', self.id, '--end-session'])
         self.id = None
@@ -1,325 +1,404 @@
-from __future__ import print_function
-
 import os
 import sys
-import shutil
-import tempfile
 import unittest
+import subprocess
 
 from dirtbike.testing.helpers import (
     call, chdir, output, temporary_directory)
 from dirtbike.testing.schroot import Session
-from glob import glob
-from pkg_resources import resource_filename
 
 
 KEEP_SESSIONS = os.getenv('DIRTBIKE_DEBUG_SESSIONS')
+TESTS_DIR = os.path.abspath(os.path.dirname(__file__))
+# The root of the source tree, which dirtbike is run from.
+SOURCE_DIR = os.path.dirname(os.path.dirname(TESTS_DIR))
+EXAMPLE_DIR = os.path.join(TESTS_DIR, 'example', 'stupid')
+# The schroot's Python matching the one running the tests.
+PYTHON = 'python{}.{}'.format(*sys.version_info[:2])
 
 
-class TestDirtbike(unittest.TestCase):
-    def setUp(self):
-        base_dir = os.path.abspath(os.path.dirname(
-            resource_filename('dirtbike.tests', '__init__.py')))
-        self.example_dir = os.path.join(base_dir, 'example', 'stupid')
-        self.session = None
-        self.python = 'python{}.{}'.format(*sys.version_info[:2])
-
-    def tearDown(self):
-        for filename in glob('./*.whl'):
-            os.remove(filename)
-
-    def _start_session(self, install=True):
-        self.session = Session()
-        self.session.start()
-        # Convenience so the caller doesn't have to tear down the
-        # session, unless it's being explicitly preserved.
-        if KEEP_SESSIONS:
-            print()
-            print()
-            print('KEEPING SESSION:', self.session.id, file=sys.stderr)
-            print()
-        else:
-            self.addCleanup(self.session.end)
-        if install:
-            self.session.call(
-                [self.python, 'setup.py', 'install'],
-                env=dict(LC_ALL='en_US.UTF-8'))
+def _start_session():
+    session = Session()
+    session.start()
+    if KEEP_SESSIONS:
+        print()
+        print()
+        print('KEEPING SESSION:', session.id, file=sys.stderr)
+        print()
+    return session
 
-    def _install_example(self):
-        with chdir(self.example_dir):
+
+def _end_session(session):
+    # Sessions which are being explicitly preserved are left for the
+    # developer to tear down.
+    if not KEEP_SESSIONS:
+        session.end()
+
+
+def _find_all(directory, suffix, prefix=''):
+    # A single directory read, without glob's pattern matching and per-match
+    # stat calls.
+    return [os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.startswith(prefix) and name.endswith(suffix)]
+
+
+def _find_one(directory, suffix, prefix=''):
+    matches = _find_all(directory, suffix, prefix)
+    assert len(matches) == 1, matches
+    return matches[0]
+
+
+def _one_wheel(directory, name):
+    # The schroot shares the host's working directory and /tmp, so the .whl
+    # files dirtbike leaves there can be found without another trip into the
+    # schroot.
+    return _find_one(directory, '.whl', name + '-')
+
+
+def _dirtbike(*args, **env):
+    # Return the command line for running dirtbike straight out of this
+    # source tree, which the schroot can see, rather than installing it into
+    # every new session.  Any keyword arguments are extra environment
+    # variables for dirtbike.
+    env.update(LC_ALL='en_US.UTF-8', PYTHONPATH=SOURCE_DIR)
+    variables = ['{}={}'.format(key, value)
+                 for key, value in sorted(env.items())]
+    return ['env'] + variables + [PYTHON, '-m', 'dirtbike'] + list(args)
+
+
+def _deb_install_command(session):
+    # Return the command line for installing a local .deb and all its
+    # dependencies in the session.  apt-get can do this in a single
+    # transaction, but only as of apt 1.1; older releases (e.g. vivid, with
+    # apt 1.0.9) would take the path for a package name, so use gdebi there.
+    version = session.output(
+        ['dpkg-query', '--show', '--showformat=${Version}', 'apt'])
+    try:
+        session.call(['dpkg', '--compare-versions', version, 'ge', '1.1'])
+    except subprocess.CalledProcessError:
+        return ['gdebi', '-n']
+    return ['apt-get', 'install', '-y', '--no-install-recommends']
+
+
+def _installed_packages(session):
+    # Return the names of all the packages installed in the session.  Unlike
+    # `dpkg -l <package>`, this doesn't fail for packages dpkg has never
+    # heard of, or has forgotten after they were removed.
+    status = session.output(
+        ['dpkg-query', '--show', '--showformat=${Package} ${Status}\\n'])
+    return set(line.split()[0]
+               for line in status.splitlines()
+               if line.endswith(' installed'))
+
+
+def _build_example_deb(destination):
+    # Build the example project's .deb into the destination directory,
+    # returning its path.  bdist_deb takes its output directory from the
+    # sdist_dsc command, so all of stdeb's artifacts land in the destination
+    # and get cleaned up along with it.
+    try:
+        with chdir(EXAMPLE_DIR):
             call([
-                self.python,
+                PYTHON,
                 'setup.py', '--no-user-cfg',
                 '--command-packages=stdeb.command',
+                'sdist_dsc', '--dist-dir', destination,
                 'bdist_deb'
                 ])
-            # bdist_deb can't be told where to leave its artifacts, so
-            # make sure that cruft gets cleaned up after this test.
-            dist_dir = os.path.join(self.example_dir, 'deb_dist')
-            self.addCleanup(shutil.rmtree, os.path.join(dist_dir))
-            tar_gzs = glob(os.path.join(self.example_dir, '*.tar.gz'))
-            if len(tar_gzs) > 0:
-                assert len(tar_gzs) == 1, tar_gzs
-                self.addCleanup(os.remove, tar_gzs[0])
-            # Install the .deb and all its dependencies in the schroot.
-            debs = glob(os.path.join(dist_dir, '*.deb'))
-            self.assertEqual(len(debs), 1)
-            deb = debs[0]
-            self.session.call(['gdebi', '-n', deb])
+    finally:
+        # Don't leave the sdist tarball behind in the example project either.
+        # Nothing here may raise, or it would mask a failed build's error.
+        for tar_gz in _find_all(EXAMPLE_DIR, '.tar.gz'):
+            os.remove(tar_gz)
+    return _find_one(destination, '.deb')
+
+
+class _HelperMixin(object):
+    def _temporary_directory(self):
+        tempdir = temporary_directory()
+        self.addCleanup(tempdir.cleanup)
+        return tempdir.name
+
+    def _working_directory(self):
+        # Tests may run in parallel, so don't let dirtbike leave its .whl
+        # files in the shared working directory.  The schroot runs commands
+        # in the caller's current directory, and bind mounts /tmp.
+        return self._temporary_directory()
+
+
+class TestDirtbike(_HelperMixin, unittest.TestCase):
+    """Tests which rewheel the example project's .deb.
+
+    Starting a schroot session and building the example .deb are expensive,
+    so all the tests in this class share one of each.  _install_example()
+    makes sure the example .deb is purged again after every test, so the
+    session is left as it was found.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # tearDownClass() isn't called if this fails, so don't leak the
+        # temporary directory or the schroot session and its overlay.
+        cls.deb_dir = temporary_directory()
+        try:
+            cls.deb = _build_example_deb(cls.deb_dir.name)
+            cls.session = _start_session()
+        except Exception:
+            cls.deb_dir.cleanup()
+            raise
+        try:
+            cls.install_command = _deb_install_command(cls.session)
+        except Exception:
+            _end_session(cls.session)
+            cls.deb_dir.cleanup()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        _end_session(cls.session)
+        cls.deb_dir.cleanup()
+
+    def _install_example(self):
+        # Install the .deb and all its dependencies in the schroot.  apt-get
+        # needs the path to contain a slash, which our absolute path always
+        # does.
+        self.session.call(self.install_command + [self.deb])
+        # The session is shared with the rest of this class's tests, so make
+        # sure the .deb is gone again even if this test fails before its own
+        # purge.  Purging an already purged package is harmless.
+        self.addCleanup(
+            self.session.call, ['apt-get', 'purge', '-y', 'python3-stupid'])
 
     def test_sanity_check_wheel(self):
-        # Sanity check that the setUpClass() created the wheel, that it can be
-        # pip installed in a temporary directory, and that with only the
-        # installed package on sys.path, the package can be imported and run.
-        dist_dir = temporary_directory()
-        self.addCleanup(dist_dir.cleanup)
-        with chdir(self.example_dir):
-            call([
-                sys.executable,
-                'setup.py', '--no-user-cfg',
-                'bdist_wheel', '--universal',
-                '--dist-dir', dist_dir.name,
-                ])
-        wheels = glob(os.path.join(dist_dir.name, '*.whl'))
-        self.assertEqual(len(wheels), 1)
-        wheel = wheels[0]
-        with temporary_directory() as tempdir:
-            call(['pip', 'install', '--target', tempdir, wheel])
-            result = output(
-                [sys.executable, '-c', 'import stupid; stupid.yes()'],
-                env=dict(PYTHONPATH=tempdir))
+        # Sanity check that the example project can be built into a wheel,
+        # and that with only the wheel on sys.path, the package can be
+        # imported and run.
+        dist_dir = self._temporary_directory()
+        if sys.version_info >= (3, 5):
+            # Only build the wheel; building an sdist first (the default for
+            # `python -m build`) would just be thrown away.  --no-isolation
+            # reuses this environment's setuptools and wheel instead of
+            # installing fresh copies into a throwaway virtual environment.
+            command = [
+                sys.executable, '-m', 'build',
+                '--wheel', '--no-isolation',
+                '--outdir', dist_dir,
+                ]
+        else:
+            # build doesn't support Python 3.4, but pip wheel builds with this
+            # environment's setuptools and wheel too.
+            command = [
+                sys.executable, '-m', 'pip', 'wheel',
+                '--no-deps', '--wheel-dir', dist_dir,
+                ]
+        call(command + [EXAMPLE_DIR])
+        wheel = _one_wheel(dist_dir, 'stupid')
+        result = output(
+            [sys.executable, '-c', 'import stupid; stupid.yes()'],
+            env=dict(PYTHONPATH=wheel))
         self.assertEqual(result, 'yes\n')
 
     def test_deb_to_whl(self):
         # Create a .deb, install it into a chroot, then turn it back
         # into a wheel and verify the contents.
-        self._start_session()
         self._install_example()
         # Verify the .deb installed package.
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'])
+            [PYTHON, '-c', 'import stupid; stupid.yes()'])
         self.assertEqual(result, 'yes\n')
         # Use dirtbike in the schroot to turn the installed package back into a
         # whl.  To verify it, we'll purge the deb and run the package test with
         # the .whl in sys.path.
-        self.session.call('/usr/local/bin/dirtbike stupid',
-                          env=dict(LC_ALL='en_US.UTF-8'))
-        prefix = 'python3' if sys.version_info >= (3,) else 'python'
-        self.session.call('apt-get purge -y {}-stupid'.format(prefix))
+        workdir = self._working_directory()
+        self.session.call_script([
+            _dirtbike('stupid'),
+            ['apt-get', 'purge', '-y', 'python3-stupid'],
+            ], cwd=workdir)
         # What's the name of the .whl file?
-        result = self.session.output('find . -maxdepth 1 -name *.whl')
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
+        wheel = _one_wheel(workdir, 'stupid')
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'],
+            [PYTHON, '-c', 'import stupid; stupid.yes()'],
             env=dict(PYTHONPATH=wheel))
         self.assertEqual(result, 'yes\n')
 
-    def test_no_egg_to_whl(self):
-        # Create a .deb for a package which doesn't have an .egg-info
-        # directory.  An example of this in Debian is pkg_resources which
-        # upstream is part of setuptools, but is split in Debian.
-        self._start_session()
-        self.session.call(['apt-get', 'install', 'python3-pkg-resources'])
-        # Use dirtbike in the chroot to turn pkg_resources back into a whl.
-        # To verify that, we'll purge the deb and try to import the package
-        # with the .whl in sys.path.
-        self.session.call('/usr/local/bin/dirtbike pkg_resources',
-                          env=dict(LC_ALL='en_US.UTF-8'))
-        self.session.call('apt-get purge -y python3-pkg-resources')
-        # What's the name of the .whl file?
-        result = self.session.output('find . -maxdepth 1 -name *.whl')
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
-        result = self.session.output(
-            # Call Python w/o invoking system site.py or the user's site
-            # directory, both of which can cause failures in Python 2.
-            [self.python, '-Ssc',
-             'import pkg_resources; print(pkg_resources.__file__)'],
-            env=dict(PYTHONPATH=wheel))
-        # In Python 2, the __file__ is a relative directory.
-        package_path = os.path.abspath(result.strip())
-        wheel_path = os.path.join(
-            os.path.abspath(wheel),
-            'pkg_resources',
-            '__init__.py')
-        self.assertEqual(package_path, wheel_path)
-
     def test_directory(self):
         # Test the -d option.
-        self._start_session()
         self._install_example()
         # Verify the .deb installed package.
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'])
+            [PYTHON, '-c', 'import stupid; stupid.yes()'])
         self.assertEqual(result, 'yes\n')
         # Use dirtbike in the schroot to turn the installed package back into a
         # whl.  To verify it, we'll purge the deb and run the package test with
         # the .whl in sys.path.
-        destination = tempfile.mkdtemp()
-        self.addCleanup(shutil.rmtree, destination)
-        self.session.call(
-            ('/usr/local/bin/dirtbike', '-d',
-             destination, 'stupid'),
-            env=dict(LC_ALL='en_US.UTF-8'))
-        prefix = 'python3' if sys.version_info >= (3,) else 'python'
-        self.session.call('apt-get purge -y {}-stupid'.format(prefix))
-        result = self.session.output('find {} -name *.whl'.format(destination))
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
+        destination = self._temporary_directory()
+        self.session.call_script([
+            _dirtbike('-d', destination, 'stupid'),
+            ['apt-get', 'purge', '-y', 'python3-stupid'],
+            ])
+        wheel = _one_wheel(destination, 'stupid')
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'],
+            [PYTHON, '-c', 'import stupid; stupid.yes()'],
             env=dict(PYTHONPATH=wheel))
         self.assertEqual(result, 'yes\n')
 
     def test_dirtbike_directory_envar(self):
         # Test the $DIRTBIKE_DIRECTORY environment variable.
-        self._start_session()
         self._install_example()
         # Verify the .deb installed package.
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'])
+            [PYTHON, '-c', 'import stupid; stupid.yes()'])
         self.assertEqual(result, 'yes\n')
         # Use dirtbike in the schroot to turn the installed package back into a
         # whl.  To verify it, we'll purge the deb and run the package test with
         # the .whl in sys.path.
-        destination = tempfile.mkdtemp()
-        self.addCleanup(shutil.rmtree, destination)
-        self.session.call(
-            '/usr/local/bin/dirtbike stupid',
-            env=dict(LC_ALL='en_US.UTF-8',
-                     DIRTBIKE_DIRECTORY=destination))
-        prefix = 'python3' if sys.version_info >= (3,) else 'python'
-        self.session.call('apt-get purge -y {}-stupid'.format(prefix))
-        result = self.session.output('find {} -name *.whl'.format(destination))
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
+        destination = self._temporary_directory()
+        self.session.call_script([
+            _dirtbike('stupid', DIRTBIKE_DIRECTORY=destination),
+            ['apt-get', 'purge', '-y', 'python3-stupid'],
+            ])
+        wheel = _one_wheel(destination, 'stupid')
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'],
+            [PYTHON, '-c', 'import stupid; stupid.yes()'],
             env=dict(PYTHONPATH=wheel))
         self.assertEqual(result, 'yes\n')
 
     def test_switch_overrides_envar(self):
         # Test that the -d option overrides the $DIRTBIKE_DIRECTORY
         # environment variable.
-        self._start_session()
         self._install_example()
         # Verify the .deb installed package.
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'])
+            [PYTHON, '-c', 'import stupid; stupid.yes()'])
         self.assertEqual(result, 'yes\n')
         # Use dirtbike in the schroot to turn the installed package back into a
         # whl.  To verify it, we'll purge the deb and run the package test with
         # the .whl in sys.path.
-        destination = tempfile.mkdtemp()
-        self.addCleanup(shutil.rmtree, destination)
-        other_destination = tempfile.mkdtemp()
-        self.addCleanup(shutil.rmtree, other_destination)
-        self.session.call(
-            ('/usr/local/bin/dirtbike',
-             '-d', destination, 'stupid'),
-            env=dict(LC_ALL='en_US.UTF-8',
-                     DIRTBIKE_DIRECTORY=other_destination))
-        prefix = 'python3' if sys.version_info >= (3,) else 'python'
-        self.session.call('apt-get purge -y {}-stupid'.format(prefix))
-        result = self.session.output('find {} -name *.whl'.format(destination))
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
+        destination = self._temporary_directory()
+        other_destination = self._temporary_directory()
+        self.session.call_script([
+            _dirtbike('-d', destination, 'stupid',
+                      DIRTBIKE_DIRECTORY=other_destination),
+            ['apt-get', 'purge', '-y', 'python3-stupid'],
+            ])
+        wheel = _one_wheel(destination, 'stupid')
         result = self.session.output(
-            [self.python, '-c', 'import stupid; stupid.yes()'],
+            [PYTHON, '-c', 'import stupid; stupid.yes()'],
             env=dict(PYTHONPATH=wheel))
         self.assertEqual(result, 'yes\n')
 
-    @unittest.skipIf(sys.version_info.major == 2, 'Python 3 only test')
+    def test_entry_points_survive(self):
+        # Issue #19 describes a problem where the entry_points.txt file
+        # doesn't survive from the .egg-info directory into the .dist-info
+        # directory in the resulting wheel.  This is because bdist_wheel
+        # called install_egg_info which deletes the entire .egg-info
+        # directory!  Make sure this doesn't happen.
+        self._install_example()
+        # Use dirtbike in the schroot to turn the installed package back into a
+        # whl, then purge the deb.
+        destination = self._temporary_directory()
+        self.session.call_script([
+            _dirtbike('-d', destination, 'stupid'),
+            ['apt-get', 'purge', '-y', 'python3-stupid'],
+            ])
+        # Verify that the zip file has an .egg-info/entry_points.txt.
+        whl_file = os.path.join(destination, 'stupid-2.0-py2.py3-none-any.whl')
+        ep_file = 'stupid-2.0.dist-info/entry_points.txt'
+        result = self.session.output(
+            [PYTHON, '-c',
+             "from zipfile import ZipFile; "
+             "print(ZipFile('{}').getinfo('{}').filename)".format(
+                 whl_file, ep_file)
+            ])
+        self.assertEqual(result.strip(), ep_file)
+
+
+class TestSystemPackages(_HelperMixin, unittest.TestCase):
+    """Tests which rewheel packages from the OS.
+
+    These tests add and remove OS packages that other tests, and dirtbike
+    itself, depend on, so each one gets a fresh schroot session.
+    """
+
+    def setUp(self):
+        self.session = _start_session()
+        self.addCleanup(_end_session, self.session)
+
+    def test_no_egg_to_whl(self):
+        # Create a .deb for a package which doesn't have an .egg-info
+        # directory.  An example of this in Debian is pkg_resources which
+        # upstream is part of setuptools, but is split in Debian.
+        # Use dirtbike in the chroot to turn pkg_resources back into a whl.
+        # To verify that, we'll purge the deb and try to import the package
+        # with the .whl in sys.path.
+        workdir = self._working_directory()
+        self.session.call_script([
+            ['apt-get', 'install', '-y', 'python3-pkg-resources'],
+            _dirtbike('pkg_resources'),
+            ['apt-get', 'purge', '-y', 'python3-pkg-resources'],
+            ], cwd=workdir)
+        # What's the name of the .whl file?
+        wheel = _one_wheel(workdir, 'pkg_resources')
+        result = self.session.output(
+            # Call Python w/o invoking system site.py or the user's site
+            # directory, so that only the wheel can provide pkg_resources.
+            [PYTHON, '-Ssc',
+             'import pkg_resources; print(pkg_resources.__file__)'],
+            env=dict(PYTHONPATH=wheel))
+        self.assertEqual(
+            result.strip(),
+            os.path.join(wheel, 'pkg_resources', '__init__.py'))
+
     def test_stdlib_python3(self):
         # Install a package that exists in the stdlib of Python 3 but must be
         # apt-get installed in Python 2.  dirtbike can call out to the other
         # Python to find the package.
-        self._start_session()
         # Install a package known not to exist in this version of Python.
         # This must be a pure-Python package that can be made universal.
-        self.session.call('apt-get install -y python-ipaddress')
-        self.session.call('/usr/local/bin/dirtbike ipaddress',
-                          env=dict(LC_ALL='en_US.UTF-8'))
-        # Remove the OS package and try to invoke this with the wheel.
-        self.session.call('apt-get purge -y python-ipaddress')
-        result = self.session.output('find . -maxdepth 1 -name *.whl')
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
+        # Then remove the OS package and try to invoke this with the wheel.
+        workdir = self._working_directory()
+        self.session.call_script([
+            ['apt-get', 'install', '-y', 'python-ipaddress'],
+            _dirtbike('ipaddress'),
+            ['apt-get', 'purge', '-y', 'python-ipaddress'],
+            ], cwd=workdir)
+        wheel = _one_wheel(workdir, 'ipaddress')
         # Try to import the package with the version of Python foreign to the
         # one that created the wheel.
         result = self.session.output(
             ['python3', '-Ssc',
              'import ipaddress; print(ipaddress.__file__)'],
             env=dict(PYTHONPATH=wheel)).strip()
-        # Python 2.7 and Python 3.4+ differ.
-        assertRegex = getattr(self, 'assertRegex',
-                              getattr(self, 'assertRegexpMatches'))
-        assertRegex(result, r'\./ipaddress-.*\.whl/ipaddress.py')
+        self.assertEqual(result, os.path.join(wheel, 'ipaddress.py'))
 
     def test_other_python(self):
         # Install a package that will only exist in one version of Python
         # (e.g. Python 2-only).  dirtbike can call out to the other Python to
         # find the package.  This must be a pure-Python package that can be
         # made universal.
-        package = 'python{}-six'.format(
-            '' if sys.version_info.major == 3 else '3')
-        self._start_session()
-        # Start fresh.
-        self.session.call('apt-get purge -y python-six python3-six')
-        self.session.call([self.python, 'setup.py', 'install'],
-                          env=dict(LC_ALL='en_US.UTF-8'))
-        self.session.call('apt-get install -y {}'.format(package))
-        # Until issue #5 is fixed.
-        self.session.call('apt-get install -y python-mock')
-        self.session.call('/usr/local/bin/dirtbike six',
-                          env=dict(LC_ALL='en_US.UTF-8'))
-        # Remove the OS package and try to invoke this with the wheel.
-        self.session.call('apt-get purge -y {}'.format(package))
-        result = self.session.output('find . -maxdepth 1 -name *.whl')
-        wheels = [entry.strip() for entry in result.splitlines()]
-        self.assertEqual(len(wheels), 1, wheels)
-        wheel = wheels[0]
+        #
+        # Start fresh.  In a single apt transaction, remove this Python's six
+        # (the trailing - tells apt-get to remove it) and install the other's,
+        # along with python-mock until issue #5 is fixed.  Then remove the OS
+        # package and try to invoke this with the wheel.
+        self.session.call(
+            ['apt-get', 'install', '-y',
+             'python3-six-', 'python-six', 'python-mock'])
+        # Make sure the swap really happened, otherwise dirtbike could find
+        # this Python's six and the test would prove nothing.
+        installed = _installed_packages(self.session)
+        self.assertNotIn('python3-six', installed)
+        self.assertIn('python-six', installed)
+        workdir = self._working_directory()
+        self.session.call_script([
+            _dirtbike('six'),
+            ['apt-get', 'purge', '-y', 'python-six'],
+            ], cwd=workdir)
+        wheel = _one_wheel(workdir, 'six')
         # Try to import the package with the version of Python foreign to the
         # one that created the wheel.
         result = self.session.output(
-            [self.python, '-Ssc', 'import six; print(six.__file__)'],
+            [PYTHON, '-Ssc', 'import six; print(six.__file__)'],
             env=dict(PYTHONPATH=wheel)).strip()
-        # Python 2.7 and Python 3.4+ differ.
-        assertRegex = getattr(self, 'assertRegex',
-                              getattr(self, 'assertRegexpMatches'))
-        assertRegex(result, r'\./six-.*\.whl/six.py')
-
-    def test_entry_points_survive(self):
-        # Issue #19 describes a problem where the entry_points.txt file
-        # doesn't survive from the .egg-info directory into the .dist-info
-        # directory in the resulting wheel.  This is because bdist_wheel
-        # called install_egg_info which deletes the entire .egg-info
-        # directory!  Make sure this doesn't happen.
-        self._start_session()
-        self._install_example()
-        # Use dirtbike in the schroot to turn the installed package back into a
-        # whl.  To verify it, we'll purge the deb and run the package test with
-        # the .whl in sys.path.
-        destination = tempfile.mkdtemp()
-        self.addCleanup(shutil.rmtree, destination)
-        self.session.call(
-            ('/usr/local/bin/dirtbike', '-d',
-             destination, 'stupid'),
-            env=dict(LC_ALL='en_US.UTF-8'))
-        # Verify that the zip file has an .egg-info/entry_points.txt.
-        whl_file = os.path.join(destination, 'stupid-2.0-py2.py3-none-any.whl')
-        ep_file = 'stupid-2.0.dist-info/entry_points.txt'
-        result = self.session.output(
-            [self.python, '-c',
-             "from zipfile import ZipFile; "
-             "print(ZipFile('{}').getinfo('{}').filename)".format(
-                 whl_file, ep_file)
-            ])
-        self.assertEqual(result.strip(), ep_file)
+        self.assertEqual(result, os.path.join(wheel, 'six.py'))
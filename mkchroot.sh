@@ -51,6 +51,9 @@ fi
 schroot -u root -c source:$CHROOT -- apt-get update
 
 # Do these installs here because in Ubuntu, some of them come from universe.
+# Along with the example project's build dependencies, this pre-installs
+# dirtbike's own run time dependencies, so that the test suite can run dirtbike
+# from the source tree without installing it into every session.
 schroot -u root -c source:$CHROOT -- apt-get install --yes python-setuptools python-stdeb python-wheel python-mock python3-setuptools python3-stdeb python3-wheel
 
 echo "schroot $CHROOT is ready"